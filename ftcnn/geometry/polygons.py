@@ -1,12 +1,30 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+
 import geopandas as gpd
+import numpy as np
 import rasterio
 import shapely
+from numpy.typing import ArrayLike
 from rasterio.io import DatasetWriter
 from rasterio.windows import Window
 from shapely import normalize, polygonize
-from shapely.geometry import Polygon
+from shapely.geometry import MultiPolygon, Polygon
 
 from ftcnn.geometry import PolygonLike
+from ftcnn.utils import NUM_CPU
+
+# Row count above which flatten_polygons unions its groups in worker
+# processes instead of a single dissolve.
+PARALLEL_UNION_MIN_ROWS = 100_000
+
+
+def _union_geometry_groups(groups: list[np.ndarray]) -> list[PolygonLike]:
+    """
+    Unions each group's geometry array. Runs in a worker process, so the
+    GEOS work for a chunk of groups happens off the main process.
+    """
+    return [shapely.union_all(geoms) for geoms in groups]
 
 
 def flatten_polygons(
@@ -33,28 +51,49 @@ def flatten_polygons(
         - For MultiPolygon geometries, each individual polygon is extracted and treated as a separate row.
         - The bounding boxes are calculated for each polygon and added as a new field.
     """
-    geometry = []
-    rows = []
-
-    for _, group in gdf_src.groupby(group_by, sort=False):
-        polygon = shapely.unary_union(group.geometry)
-        if isinstance(polygon, shapely.MultiPolygon):
-            for i, poly in enumerate(polygon.geoms):
-                poly = normalize(poly)
-                row = group.iloc[i].drop(geometry_column).to_dict()
-                for bbox in get_polygon_bboxes(polygon):
-                    row["bbox"] = bbox
-                    rows.append(row)
-                    geometry.append(polygon)
-        else:
-            polygon = normalize(polygon)
-            row = group.iloc[0].drop(geometry_column).to_dict()
-            for bbox in get_polygon_bboxes(polygon):
-                row["bbox"] = bbox
-                rows.append(row)
-                geometry.append(polygon)
+    if group_by is not None and len(gdf_src) >= PARALLEL_UNION_MIN_ROWS:
+        # Divide-and-conquer: union chunks of groups in worker processes,
+        # then assemble the dissolved frame from each group's first row.
+        indices = list(gdf_src.groupby(group_by, sort=False).indices.values())
+        geoms = gdf_src[geometry_column].values
+        group_geoms = [geoms[idx] for idx in indices]
+
+        chunk_size = -(-len(group_geoms) // NUM_CPU)
+        chunks = [
+            group_geoms[i : i + chunk_size]
+            for i in range(0, len(group_geoms), chunk_size)
+        ]
+        with ProcessPoolExecutor(max_workers=NUM_CPU) as executor:
+            unions = [
+                union
+                for chunk in executor.map(_union_geometry_groups, chunks)
+                for union in chunk
+            ]
+
+        dissolved = gdf_src.iloc[[idx[0] for idx in indices]].copy()
+        dissolved[geometry_column] = unions
+    else:
+        dissolved = gdf_src.dissolve(
+            by=group_by, aggfunc="first", sort=False
+        ).reset_index()
+    exploded = dissolved.explode(index_parts=False, ignore_index=True)
+
+    geometry = shapely.normalize(exploded[geometry_column].values)
+
+    bounds = exploded.bounds
+    bboxes = shapely.normalize(
+        shapely.box(
+            bounds["minx"].to_numpy(),
+            bounds["miny"].to_numpy(),
+            bounds["maxx"].to_numpy(),
+            bounds["maxy"].to_numpy(),
+        )
+    )
+
+    exploded = exploded.drop(columns=geometry_column)
+    exploded["bbox"] = bboxes
 
-    return gpd.GeoDataFrame(rows, geometry=geometry, crs=gdf_src.crs)
+    return gpd.GeoDataFrame(exploded, geometry=geometry, crs=gdf_src.crs)
 
 
 def get_polygon_points(
@@ -78,16 +117,13 @@ def get_polygon_points(
     Raises:
         ValueError: If the input geometry is not a Polygon or MultiPolygon.
     """
-    match (polygon.geom_type):
-        case "Polygon":
-            points = [point for point in polygon.exterior.coords]
-        case "MultiPolygon":
-            points = [
-                [point for point in polygon.exterior.coords]
-                for polygon in polygon.geoms
-            ]
-        case _:
-            raise ValueError("Unknown geometry type")
+    if isinstance(polygon, Polygon):
+        points = shapely.get_coordinates(polygon.exterior).tolist()
+    elif isinstance(polygon, MultiPolygon):
+        rings = shapely.get_exterior_ring(shapely.get_parts(polygon))
+        points = [shapely.get_coordinates(ring).tolist() for ring in rings]
+    else:
+        raise ValueError("Unknown geometry type")
     return points
 
 
@@ -108,14 +144,16 @@ def get_polygon_bboxes(geom: PolygonLike) -> list[Polygon]:
         For a multipolygon, this will return a list of bounding boxes, one for each individual polygon.
     """
     boxes = []
-    match (geom.geom_type):
-        case "Polygon":
-            boxes.append(normalize(shapely.box(*geom.bounds)))
-        case "MultiPolygon":
-            for geom in geom.geoms:
-                boxes.append(normalize(shapely.box(*geom.bounds)))
-        case _:
-            print("Unknown geometry type")
+    if isinstance(geom, Polygon):
+        boxes.append(normalize(shapely.box(*geom.bounds)))
+    elif isinstance(geom, MultiPolygon):
+        parts = np.asarray(list(geom.geoms))
+        bounds = shapely.bounds(parts)
+        boxes = shapely.normalize(
+            shapely.box(bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3])
+        ).tolist()
+    else:
+        print("Unknown geometry type")
     return boxes
 
 
@@ -140,37 +178,21 @@ def get_geom_polygons(geom: PolygonLike, *, flatten: bool = False) -> list[Polyg
     """
     polygons = []
 
-    match (geom.geom_type):
-        case "Polygon":
-            polygons.append(normalize(geom))
-        case "MultiPolygon":
-            if not flatten:
-                polygons.extend([normalize(g) for g in list(geom.geoms)])
-            else:
-                flattened = []
-                for polygon in [normalize(p) for p in list(geom.geoms)]:
-                    if len(flattened) == 0:
-                        flattened.append(polygon)
-                        continue
-                    found = False
-                    for i, flat in enumerate(flattened):
-                        union = shapely.coverage_union(flat, polygon)
-                        for poly in union.geoms:
-                            # There is no union
-                            if poly.equals(flat) or poly.equals(polygon):
-                                continue
-                            # Replace this polygon with the union
-                            flattened[i] = poly
-                            found = True
-                            break
-                        if found:
-                            break
-                    if not found:
-                        flattened.append(polygon)
-                polygons.extend(flattened)
-
-        case _:
-            raise ValueError("Unknown geometry type")
+    if isinstance(geom, Polygon):
+        polygons.append(normalize(geom))
+    elif isinstance(geom, MultiPolygon):
+        if not flatten:
+            polygons.extend([normalize(g) for g in list(geom.geoms)])
+        else:
+            parts = shapely.normalize(np.asarray(list(geom.geoms)))
+            try:
+                merged = shapely.coverage_union_all(parts)
+            except shapely.errors.GEOSException:
+                # Overlapping parts are not a valid coverage
+                merged = shapely.unary_union(parts)
+            polygons.extend(get_geom_polygons(merged, flatten=False))
+    else:
+        raise ValueError("Unknown geometry type")
     return polygons
 
 
@@ -204,16 +226,30 @@ def create_tile_polygon(src: DatasetWriter, tile_window: Window) -> Polygon:
     width: int = tile_window.width
     height: int = tile_window.height
 
-    tile_polygon = Polygon(
+    # Apply the affine to all four corners (closed ring) in one matmul
+    # instead of five Affine.__mul__ dispatches.
+    linear = np.array(
         [
-            tile_transform * (0, 0),  # Top-left
-            tile_transform * (width, 0),  # Top-right
-            tile_transform * (width, height),  # Bottom-right
-            tile_transform * (0, height),  # Bottom-left
-            tile_transform * (0, 0),  # Close the polygon (back to top-left)
+            [tile_transform.a, tile_transform.b],
+            [tile_transform.d, tile_transform.e],
         ]
     )
-    return tile_polygon
+    offset = np.array([tile_transform.c, tile_transform.f])
+    corners = np.array(
+        [
+            [0, 0],  # Top-left
+            [width, 0],  # Top-right
+            [width, height],  # Bottom-right
+            [0, height],  # Bottom-left
+            [0, 0],  # Close the polygon (back to top-left)
+        ],
+        dtype=np.float64,
+    )
+
+    return Polygon(corners @ linear.T + offset)
+
+
+POLYGON_COORD_PAIR_RE = re.compile(r"(-?\d+(?:\.\d+)?)\s+(-?\d+(?:\.\d+)?)")
 
 
 def parse_polygon_str(polygon_str: str):
@@ -221,8 +257,9 @@ def parse_polygon_str(polygon_str: str):
     Parses a polygon string into a list of coordinate tuples.
 
     The function extracts the coordinates from a well-formed polygon string, where each coordinate pair is
-    separated by a comma and space, and coordinates are enclosed in parentheses. The string is stripped of
-    any leading or trailing non-digit characters, then the coordinates are parsed and returned as a list of tuples.
+    separated by a comma and space, and coordinates are enclosed in parentheses. Coordinate pairs are
+    matched with a compiled regular expression and bulk-converted to floats, so any surrounding text
+    (e.g. a WKT prefix or parentheses) is ignored.
 
     Parameters:
         polygon_str (str): A string representation of a polygon with coordinates, such as:
@@ -235,30 +272,11 @@ def parse_polygon_str(polygon_str: str):
         Given the input: "(1 2, 3 4, 5 6)",
         The function will return: [(1.0, 2.0), (3.0, 4.0), (5.0, 6.0)].
     """
-    size = len(polygon_str)
-    start = 0
-    end = size - 1
-    while (
-        start < end
-        and start < size
-        and end >= 0
-        and not (polygon_str[start].isdigit() and polygon_str[end].isdigit())
-    ):
-        if not polygon_str[start].isdigit():
-            start += 1
-        if not polygon_str[end].isdigit():
-            end -= 1
-
-    if start < size and end >= 0:
-        polygon_str = polygon_str[start : end + 1]
-    parsed = []
-    points = polygon_str.split(", ")
-    for point in points:
-        point = point.replace(" 0", "").replace("(", "").replace(")", "")
-        x, y = point.split()
-        parsed.append((float(x), float(y)))
-
-    return parsed
+    pairs = POLYGON_COORD_PAIR_RE.findall(polygon_str)
+    if not pairs:
+        return []
+    arr = np.array(pairs, dtype=np.float64)
+    return [tuple(point) for point in arr.tolist()]
 
 
 def normalize_polygon(
@@ -291,13 +309,37 @@ def normalize_polygon(
     """
 
     if not isinstance(polygon, Polygon):
-        if isinstance(polygon, list):
-            if not isinstance(polygon[0], tuple):
-                polygon = [
-                    (polygon[i], polygon[i + 1]) for i in range(len(polygon) - 1)
-                ]
-        elif isinstance(polygon, str):
-            polygon = parse_polygon_str(polygon)
-        polygon = normalize(polygon)
-
-    return normalize(polygon.simplify(0.002, preserve_topology=True))
+        if isinstance(polygon, str):
+            try:
+                polygon = shapely.from_wkt(polygon)
+            except shapely.errors.GEOSException:
+                polygon = parse_polygon_str(polygon)
+        if not isinstance(polygon, Polygon):
+            # Accepts both flat [x1, y1, x2, y2, ...] and paired
+            # [(x1, y1), (x2, y2), ...] coordinate lists.
+            coords = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+            polygon = shapely.polygons(coords)
+
+    return normalize_polygons([polygon])[0]
+
+
+def normalize_polygons(geoms: ArrayLike) -> np.ndarray:
+    """
+    Simplifies and normalizes an array of geometries in one ufunc pipeline.
+
+    This is the batch counterpart to `normalize_polygon`: geometries are
+    simplified (tolerance 0.002, preserving topology) and normalized with a
+    single shapely call each, so large arrays avoid per-geometry Python
+    dispatch. WKT strings are parsed with `shapely.from_wkt` first; anything
+    else is passed to the ufuncs as-is.
+
+    Parameters:
+        geoms (ArrayLike): An array-like of geometries or WKT strings.
+
+    Returns:
+        np.ndarray: The simplified and normalized geometries.
+    """
+    arr = np.asarray(geoms, dtype=object)
+    if arr.size and isinstance(arr.flat[0], str):
+        arr = shapely.from_wkt(arr)
+    return shapely.normalize(shapely.simplify(arr, 0.002, preserve_topology=True))
@@ -1,10 +1,16 @@
 import os
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from os import PathLike
 from pathlib import Path
 from typing import Callable, Union
 
 import geopandas as gpd
+import numpy as np
+import pandas as pd
 import rasterio
+import shapely
 from PIL import Image
 from shapely.geometry import Polygon
 from tqdm.auto import tqdm
@@ -12,7 +18,30 @@ from tqdm.auto import tqdm
 from ftcnn.geometry.polygons import create_tile_polygon
 from ftcnn.geospacial.utils import parse_filename
 from ftcnn.io import collect_files_with_suffix
-from ftcnn.raster import create_window, open_raster
+from ftcnn.raster import create_window
+from ftcnn.utils import NUM_CPU
+
+
+@lru_cache(maxsize=65536)
+def get_image_dims(path: str) -> tuple[int, int]:
+    """
+    Reads the pixel dimensions of an image from its header.
+
+    Results are cached by path, so repeated pipeline runs in the same process
+    only open each file once. Only the header is read; the image data itself
+    is never decoded.
+
+    Parameters:
+        path (str): Path to the image file.
+
+    Returns:
+        tuple[int, int]: The image dimensions as (width, height).
+    """
+    if os.path.splitext(path)[1] in [".tiff", ".tif"]:
+        with rasterio.open(path) as img:
+            return img.width, img.height
+    with Image.open(path) as img:
+        return img.size
 
 
 def map_metadata(
@@ -44,9 +73,8 @@ def map_metadata(
     Raises:
         KeyError: If any column to preserve does not exist in the original DataFrame.
     """
-    images_dir = Path(images_dir).resolve()
+    images_dir = str(Path(images_dir).resolve())
     columns = ["filename", "path", "width", "height", "bbox"]
-    rows = []
     geometry = []
 
     # Normalize preserve_fields to a single dictionary
@@ -62,49 +90,46 @@ def map_metadata(
                     field_map.update(item)  # Add renaming mappings
     if len(field_map):
         columns.extend(field_map.keys())
-
-    for _, row in gdf_src.iterrows():
-        filename = parse_filename(row)
-        path = images_dir / filename
-
-        if path.exists():
-            # Skip duplicate paths
-            if any(r["path"] == path for r in rows):
-                continue
-
-            suffix = path.suffix
-            open_fn = open_raster if suffix in [".tiff", ".tif"] else Image.open
-
-            with open_fn(path) as img:
-                # Handle width and height based on image type
-                width, height = (
-                    img.size
-                    if isinstance(img, Image.Image)
-                    else (img.shape[1], img.shape[0])
+        # Validate preserved columns once instead of per row
+        for old_col in field_map.values():
+            if old_col not in gdf_src.columns:
+                raise KeyError(
+                    f"Column '{old_col}' does not exist in the source DataFrame."
                 )
 
-                # Base metadata
-                metadata = {
-                    "filename": filename,
-                    "path": str(path),
-                    "width": width,
-                    "height": height,
-                    "bbox": row.get("bbox", None),
-                }
-
-                # Add preserved fields with existence check
-                for new_col, old_col in field_map.items():
-                    if old_col not in row:
-                        raise KeyError(
-                            f"Column '{old_col}' does not exist in the source DataFrame."
-                        )
-                    metadata[new_col] = row.get(old_col)
-
-                rows.append(metadata)
-                geometry.append(row.get("geometry", None))
+    # Derive filenames and paths for all rows up front, then mask out
+    # missing files and duplicate paths before any raster is opened.
+    # Paths stay plain strings; allocating a pathlib.Path per row is
+    # measurable overhead at this scale.
+    filenames = gdf_src.apply(parse_filename, axis=1).to_numpy()
+    paths = [f"{images_dir}{os.sep}{filename}" for filename in filenames]
+    keep = np.array([os.path.exists(path) for path in paths], dtype=bool)
+    keep &= ~pd.Index(filenames).duplicated()
+
+    # Accumulate column-wise so the GeoDataFrame is built from contiguous
+    # arrays instead of re-parsing one dict per row.
+    data: dict[str, list] = {column: [] for column in columns}
+
+    for i in np.flatnonzero(keep):
+        row = gdf_src.iloc[i]
+        path = paths[i]
+        width, height = get_image_dims(path)
+
+        # Base metadata
+        data["filename"].append(filenames[i])
+        data["path"].append(path)
+        data["width"].append(width)
+        data["height"].append(height)
+        data["bbox"].append(row.get("bbox", None))
+
+        # Add preserved fields
+        for new_col, old_col in field_map.items():
+            data[new_col].append(row.get(old_col))
+
+        geometry.append(row.get("geometry", None))
 
     return gpd.GeoDataFrame(
-        rows,
+        data,
         columns=columns,
         geometry=geometry,
         crs=gdf_src.crs,
@@ -136,16 +161,18 @@ def map_geometry_to_geotiffs(
     rows = []
     geometry = []
 
-    orig_stems = [
+    orig_stems = sorted(
         os.path.splitext(filename)[0] for filename in gdf["filename"].unique().tolist()
-    ]
+    )
 
-    # Helper function to compare a stem against a list of names.
+    # Helper function to compare a stem against a sorted list of names.
+    # A stem matches when it and one of the names share a prefix, which only
+    # needs the neighbors of the stem's insertion point.
     def compare_stem(stem, names):
-        for name in names:
-            if stem[: len(name)] in name:
-                return True
-        return False
+        i = bisect_left(names, stem)
+        if i < len(names) and names[i].startswith(stem):
+            return True
+        return i > 0 and stem.startswith(names[i - 1])
 
     image_paths = [
         path
@@ -153,43 +180,64 @@ def map_geometry_to_geotiffs(
         if compare_stem(path.stem, orig_stems)
     ]
 
-    for path in tqdm(
-        image_paths,
-        desc="Mapping geometry to GeoTIFFs",
-        leave=False,
-    ):
+    # Index the source geometries once so each tile queries the tree instead
+    # of scanning the whole GeoDataFrame.
+    geoms = np.asarray(gdf.geometry.values)
+    tree = shapely.STRtree(geoms)
+
+    # Opening each GeoTIFF only touches its header, so probe all of them
+    # concurrently and keep the intersection queries sequential.
+    def probe(path):
         with rasterio.open(path) as src:
             # Create a window that represents the full extent of the GeoTIFF.
             tile_window = create_window(0, 0, src.width, src.height)
 
             # Create a polygon representing the bounds of the GeoTIFF.
-            tile_polygon = create_tile_polygon(src, tile_window)
-
-            # Find polygons in the GeoDataFrame that intersect with the GeoTIFF polygon.
-            intersecting_polygons = gdf.loc[gdf.intersects(tile_polygon)]
-
-            row = {
-                "filename": path.name,
-                "path": str(path),
-                "width": src.width,
-                "height": src.height,
-            }
-
-            # If intersecting polygons are found, add them to the output lists.
-            if not intersecting_polygons.empty:
-                for _, polygon_row in intersecting_polygons.iterrows():
-                    geometry.append(polygon_row["geometry"].intersection(tile_polygon))
-                    rows.append(row)
-            else:
-                # If no intersections, append an empty polygon for completeness.
-                geometry.append(Polygon())
-                rows.append(row)
+            return src.width, src.height, create_tile_polygon(src, tile_window)
 
-    return gpd.GeoDataFrame(
-        gpd.GeoDataFrame(rows, columns=columns, geometry=geometry, crs=gdf.crs)
-        .explode()
-        .drop_duplicates()
+    pbar = tqdm(
+        total=len(image_paths),
+        desc="Mapping geometry to GeoTIFFs",
+        leave=False,
     )
+    with ThreadPoolExecutor(max_workers=NUM_CPU) as executor:
+        futures = [executor.submit(probe, path) for path in image_paths]
+        for _ in as_completed(futures):
+            pbar.update()
+    pbar.close()
+
+    for path, future in zip(image_paths, futures):
+        width, height, tile_polygon = future.result()
+
+        # Find polygons in the GeoDataFrame that intersect with the GeoTIFF polygon.
+        idx = tree.query(tile_polygon, predicate="intersects")
+
+        row = {
+            "filename": path.name,
+            "path": str(path),
+            "width": width,
+            "height": height,
+        }
+
+        # If intersecting polygons are found, clip them all in one call and
+        # add them to the output lists.
+        if len(idx):
+            clipped = shapely.intersection(geoms[idx], tile_polygon)
+            geometry.extend(clipped.tolist())
+            rows.extend([row] * len(idx))
+        else:
+            # If no intersections, append an empty polygon for completeness.
+            geometry.append(Polygon())
+            rows.append(row)
+
+    gdf_mapped = gpd.GeoDataFrame(
+        rows, columns=columns, geometry=geometry, crs=gdf.crs
+    ).explode()
+
+    # Dedup on the path plus the geometry's WKB rather than hashing whole
+    # rows, which runs each geometry through WKB per comparison.
+    gdf_mapped["_wkb"] = shapely.to_wkb(gdf_mapped.geometry.values)
+    return gdf_mapped.drop_duplicates(subset=["path", "_wkb"]).drop(columns="_wkb")
 
 
 def map_geometries_by_year_span(